@@ -12,21 +12,31 @@ Models included:
 """
 
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # only saves to file, no interactive backend needed
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import random
+import multiprocessing
+import torch
 
 from connect4 import Connect4Game
 from models import HeuristicAI, MinimaxAI, MinimaxABAI, MCTSAI
 from models.rl_cnn_ai import CNNRLAI
 
-def play_matchup(ai1, ai2, num_games=10):
+def play_matchup(ai1, ai2, num_games=10, seed=None):
     """
     Play between two AIs.
     ai1 = Player 1
     ai2 = Player 2
+    seed = Seed for the random number generators, for reproducible games
     Returns win rate of ai1 (as a float 0–1).
     """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
     wins = 0
     draws = 0
 
@@ -46,6 +56,10 @@ def play_matchup(ai1, ai2, num_games=10):
 
     return wins / num_games
 
+# Heatmap rows/columns, in the order load_all_agents() builds them. Kept as a
+# constant so the parent process never has to build the agents itself.
+AGENT_NAMES = ["MCTS", "Minimax", "MinimaxAB", "Heuristic", "CNN Self 500k", "CNN Heuristic 500k"]
+
 def load_all_agents():
     """
     Load all AI models
@@ -61,59 +75,97 @@ def load_all_agents():
     cnn_self_path = "CNN_models/cnnrl_self_500k_0.999995.pt"
     cnn_heur_path = "CNN_models/cnnrl_heuristic_500k_0.999995.pt"
 
-    cnn_self = CNNRLAI(player_id=1)
+    # Workers run on the CPU; many processes sharing one GPU would each need a CUDA context
+    cnn_self = CNNRLAI(player_id=1, device="cpu")
     cnn_self.load_model(cnn_self_path)
     cnn_self.epsilon = 0.0
 
-    cnn_heur = CNNRLAI(player_id=1)
+    cnn_heur = CNNRLAI(player_id=1, device="cpu")
     cnn_heur.load_model(cnn_heur_path)
     cnn_heur.epsilon = 0.0
 
     agents["CNN Self 500k"] = cnn_self
     agents["CNN Heuristic 500k"] = cnn_heur
 
+    assert list(agents) == AGENT_NAMES
     return agents
 
-def generate_heatmap(num_games_per_match=5):
+def make_agent(template, player_id):
+    """
+    Create a copy of `template` that plays as `player_id`.
+    CNN weights are copied from the already loaded model instead of re-reading the checkpoint.
+    """
+    if isinstance(template, CNNRLAI):
+        agent = CNNRLAI(player_id=player_id, device=template.device)
+        state_dict = template.policy_network.state_dict()
+        agent.policy_network.load_state_dict(state_dict)
+        agent.target_network.load_state_dict(state_dict)
+        agent.epsilon = 0.0
+    else:
+        agent = type(template)(player_id=player_id)
+
+    return agent
+
+def build_seats():
     """
-    To run all matchups and generate the heatmap
+    Build each agent once per seat (player 1 / player 2) so it can be reused
+    for all of its matchups.
     """
     agents = load_all_agents()
-    names = list(agents.keys())
+    return {player_id: {name: make_agent(agent, player_id) for name, agent in agents.items()}
+            for player_id in (1, 2)}
+
+# Agents of the current worker process (set by init_worker)
+worker_seats = None
+
+def init_worker():
+    """Load all agents once per worker process"""
+    global worker_seats
+    torch.set_num_threads(1)  # one process per core already
+    worker_seats = build_seats()
+
+def run_matchup(task):
+    """Play one matchup in a worker process. Returns (i, j, win rate of P1)"""
+    i, j, name1, name2, num_games, seed = task
+    ai1, ai2 = worker_seats[1][name1], worker_seats[2][name2]
+
+    # A transposition table left over from earlier matchups changes the chosen moves,
+    # and which matchups this worker ran before is up to the pool
+    for agent in (ai1, ai2):
+        if isinstance(agent, (MinimaxAI, MinimaxABAI)):
+            agent.reset_search()
+
+    win_rate = play_matchup(ai1, ai2, num_games=num_games, seed=seed)
+    return i, j, win_rate
+
+def generate_heatmap(num_games_per_match=5, processes=None, seed=0):
+    """
+    To run all matchups and generate the heatmap.
+    Matchups are independent, so they are spread over `processes` worker
+    processes (default = one per CPU core, but no more than there are
+    matchups). Each matchup gets its own seed derived from `seed`, so
+    results don't depend on which worker runs it.
+    """
+    names = AGENT_NAMES
     n = len(names)
 
     win_matrix = np.zeros((n, n))
-
-    for i in range(n):
-        for j in range(n):
-            if i == j:
-                win_matrix[i][j] = 0.50  # Tie with itself
-                continue
-
-            print(f"\n=== {names[i]} (P1) vs {names[j]} (P2) ===")
-            # Re-initialize agents with correct player IDs
-            ai1 = type(agents[names[i]])(player_id=1)
-            ai2 = type(agents[names[j]])(player_id=2)
-
-            # Reload CNN weights if needed
-            if "CNN Self" in names[i]:
-                ai1.load_model("CNN_models/cnnrl_self_500k_0.999995.pt")
-                ai1.epsilon = 0.0
-            if "CNN Heuristic" in names[i]:
-                ai1.load_model("CNN_models/cnnrl_heuristic_500k_0.999995.pt")
-                ai1.epsilon = 0.0
-            if "CNN Self" in names[j]:
-                ai2.load_model("CNN_models/cnnrl_self_500k_0.999995.pt")
-                ai2.epsilon = 0.0
-            if "CNN Heuristic" in names[j]:
-                ai2.load_model("CNN_models/cnnrl_heuristic_500k_0.999995.pt")
-                ai2.epsilon = 0.0
-
-            win_rate = play_matchup(ai1, ai2, num_games=num_games_per_match)
+    np.fill_diagonal(win_matrix, 0.50)  # Tie with itself
+
+    tasks = [(i, j, names[i], names[j], num_games_per_match, seed + i * n + j)
+             for i in range(n) for j in range(n) if i != j]
+
+    if processes is None:
+        processes = min(len(tasks), os.cpu_count() or 1)
+    # "spawn" so CUDA is never inherited across a fork
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes=processes, initializer=init_worker) as pool:
+        for i, j, win_rate in pool.imap_unordered(run_matchup, tasks):
+            print(f"=== {names[i]} (P1) vs {names[j]} (P2): {win_rate:.0%} ===")
             win_matrix[i][j] = win_rate
 
     # Create heatmap (win rates shown as percentages)
-    plt.figure(figsize=(10, 8))
+    fig = plt.figure(figsize=(10, 8))
 
     # Convert win rates 0–1 to string "40%"
     percent_labels = np.vectorize(lambda x: f"{int(round(x * 100))}%")(win_matrix)
@@ -141,6 +193,7 @@ def generate_heatmap(num_games_per_match=5):
               f"Cell = Win rate of Row AI vs Column AI",)
     plt.tight_layout()
     plt.savefig("ai_vs_ai_heatmap.png")
+    plt.close(fig)
     print("\nSaved heatmap to ai_vs_ai_heatmap.png\n")
 
 if __name__ == "__main__":
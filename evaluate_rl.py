@@ -2,16 +2,35 @@
 Evaluation script for trained RL models.
 Runs each model against the RandomAI and prints win/loss/draw statistics.
 """
+import json
 import os
+import sys
+import random
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # only saves to file, no interactive backend needed
 import matplotlib.pyplot as plt
 from connect4 import Connect4Game
 from models.rl_cnn_ai import CNNRLAI
 from models.simple_ais import RandomAI
 
-def evaluate_model(model_path, num_games = 5000):
+RESULTS_PLOT = "rl_evaluation_results.png"
+# Written only after a full evaluation; lists the models that RESULTS_PLOT covers
+RESULTS_STAMP = "rl_evaluation_results.stamp"
+# Pass --draft for a faster, lower resolution plot while iterating. Drafts go to
+# their own file and never replace (or count as) the full resolution plot.
+DRAFT = "--draft" in sys.argv
+DRAFT_PLOT = "rl_evaluation_results_draft.png"
+DPI = 100 if DRAFT else 200
+
+def evaluate_model(model_path, num_games = 5000, seed = 0):
     """Evaluate a single RL model against the Random AI"""
     print(f"Evaluating model: {model_path} ({num_games} games)")
 
+    # Same opponent moves for every model and every run
+    random.seed(seed)
+    np.random.seed(seed)
+
     rl = CNNRLAI(player_id=1)
     rl.load_model(model_path)
     rl.epsilon = 0.0 # Disable exploration during evaluation
@@ -60,7 +79,7 @@ def plot_results(results):
     colors = plt.cm.tab20(range(len(results)))
 
     # Chart
-    plt.figure(figsize=(10, 5), dpi=200)
+    fig = plt.figure(figsize=(10, 5), dpi=DPI)
     bars = plt.bar(model_names, win_rates, color=colors, width=0.5)
     # Add win rate text on top of each bar
     for bar, win in zip(bars, win_rates):
@@ -81,7 +100,8 @@ def plot_results(results):
     plt.yticks(fontsize=12)
     plt.ylim(0, max(win_rates) + 7)
     plt.tight_layout()
-    plt.savefig("rl_evaluation_results.png")
+    plt.savefig(DRAFT_PLOT if DRAFT else RESULTS_PLOT)
+    plt.close(fig)
 
 def parse_model_name(filename):
     """
@@ -99,6 +119,26 @@ def parse_model_name(filename):
 
     return base  # Fallback if format is unexpected
 
+def is_up_to_date(model_paths):
+    """
+    Check if RESULTS_STAMP covers exactly `model_paths` and is newer than all of them.
+    The stamp isn't tracked by git, so a fresh clone always evaluates.
+    """
+    if not (os.path.exists(RESULTS_PLOT) and os.path.exists(RESULTS_STAMP)):
+        return False
+    try:
+        with open(RESULTS_STAMP) as f:
+            evaluated = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (evaluated == model_paths and
+            os.path.getmtime(RESULTS_STAMP) > max(os.path.getmtime(path) for path in model_paths))
+
+def write_stamp(model_paths):
+    """Record which models the freshly written RESULTS_PLOT covers"""
+    with open(RESULTS_STAMP, "w") as f:
+        json.dump(model_paths, f)
+
 def main():
     folder = "CNN_models"
 
@@ -111,13 +151,22 @@ def main():
     if not models:
         print("No CNN .pt models found.")
         return
+
+    # Skip the (slow) evaluation if this checkout already evaluated exactly these
+    # models and none changed since. Pass --force to re-run anyway.
+    model_paths = [os.path.join(folder, model) for model in sorted(models)]
+    if not DRAFT and "--force" not in sys.argv and is_up_to_date(model_paths):
+        print(f"{RESULTS_PLOT} is up to date (use --force to re-evaluate).")
+        return
     
     # Evaluate all models at once
     results = []
-    for model in models:
-        results.append(evaluate_model(os.path.join(folder, model)))
+    for path in model_paths:
+        results.append(evaluate_model(path))
     
     plot_results(results)
+    if not DRAFT:
+        write_stamp(model_paths)
     print("Evaluation completed.")
     
 if __name__ == "__main__":
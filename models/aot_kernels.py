@@ -0,0 +1,36 @@
+"""
+Loader for the ahead-of-time compiled minimax kernels
+`python -m models.build_kernels` compiles the numba searches into a native
+extension module (models/minimax_kernels*.so), which skips numba's JIT
+compilation at start-up. If the extension is missing, or was built from
+different sources, the searches fall back to the jitted functions.
+"""
+
+import hashlib
+import os
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules whose code is compiled into the kernels
+KERNEL_SOURCES = ("bitboard.py", "minimax_ab_ai.py", "minimax_ai.py")
+
+def source_fingerprint():
+    """63-bit hash of the kernel sources, used to detect a stale build"""
+    digest = hashlib.sha1()
+    for name in KERNEL_SOURCES:
+        with open(os.path.join(MODELS_DIR, name), "rb") as f:
+            digest.update(f.read())
+    return int.from_bytes(digest.digest()[:7], "little")
+
+def load_aot_kernels():
+    """Return the compiled kernel module, or None if it is missing or out of date"""
+    try:
+        from . import minimax_kernels
+    except ImportError:
+        return None
+
+    if minimax_kernels.fingerprint() != source_fingerprint():
+        print("Compiled minimax kernels are out of date, using the JIT instead "
+              "(rebuild with `python -m models.build_kernels`)")
+        return None
+    return minimax_kernels
@@ -0,0 +1,157 @@
+"""
+Bitboard helpers for Connect 4 search
+A position is stored as a pair of integers (one per player). Each column uses
+7 bits: 6 playable rows counted from the bottom plus an always-empty sentinel
+bit on top, so that shifted lines never wrap from one column into the next.
+
+    6 13 20 27 34 41 48   <- sentinel row
+    5 12 19 26 33 40 47
+    4 11 18 25 32 39 46
+    3 10 17 24 31 38 45
+    2  9 16 23 30 37 44
+    1  8 15 22 29 36 43
+    0  7 14 21 28 35 42
+
+The helpers used inside the search are compiled with numba so that the whole
+minimax recursion can run as native code on int64 bitboards.
+"""
+
+from numba import njit
+
+BOARD_WIDTH = 7
+BOARD_HEIGHT = 6
+COLUMN_BITS = BOARD_HEIGHT + 1
+
+# Per-column masks: lowest cell, highest playable cell, all playable cells
+BOTTOM_MASK = tuple(1 << (col * COLUMN_BITS) for col in range(BOARD_WIDTH))
+TOP_MASK = tuple(1 << (col * COLUMN_BITS + BOARD_HEIGHT - 1) for col in range(BOARD_WIDTH))
+COLUMN_MASK = tuple(((1 << BOARD_HEIGHT) - 1) << (col * COLUMN_BITS) for col in range(BOARD_WIDTH))
+
+BOARD_MASK = 0
+for _mask in COLUMN_MASK:
+    BOARD_MASK |= _mask
+CENTER_MASK = COLUMN_MASK[2] | COLUMN_MASK[3] | COLUMN_MASK[4]
+BOTTOM_ROW = sum(BOTTOM_MASK)
+
+# Bit shifts for the four line directions: vertical, horizontal, and both diagonals
+DIRECTIONS = (1, COLUMN_BITS, COLUMN_BITS - 1, COLUMN_BITS + 1)
+
+@njit(cache=True)
+def popcount(x):
+    """Number of set bits in `x`"""
+    count = 0
+    while x:
+        x &= x - 1
+        count += 1
+    return count
+
+def board_to_bb(board):
+    """Convert a 6x7 numpy board (row 0 = top) into a (player 1, player 2) bitboard pair"""
+    bb = [0, 0]
+    for row in range(BOARD_HEIGHT):
+        for col in range(BOARD_WIDTH):
+            if board[row][col] != 0:
+                bb[board[row][col] - 1] |= 1 << (col * COLUMN_BITS + BOARD_HEIGHT - 1 - row)
+    return bb[0], bb[1]
+
+@njit(cache=True)
+def position_key(bb):
+    """Unique integer key for a position (player 1 stones + occupancy mask)"""
+    return bb[0] + (bb[0] | bb[1])
+
+@njit(cache=True)
+def can_play(bb, col):
+    """Check if a chip can still be dropped into `col`"""
+    return (bb[0] | bb[1]) & TOP_MASK[col] == 0
+
+def valid_columns(bb):
+    """Get all columns that are not full"""
+    return [col for col in range(BOARD_WIDTH) if can_play(bb, col)]
+
+@njit(cache=True)
+def play(bb, col, player_id):
+    """Return the bitboard pair after `player_id` drops a chip into `col`"""
+    move = ((bb[0] | bb[1]) + BOTTOM_MASK[col]) & COLUMN_MASK[col]
+    if player_id == 1:
+        return bb[0] | move, bb[1]
+    return bb[0], bb[1] | move
+
+@njit(cache=True)
+def possible_moves(bb):
+    """Cells where the next chip would land, one per non-full column"""
+    return ((bb[0] | bb[1]) + BOTTOM_ROW) & BOARD_MASK
+
+@njit(cache=True)
+def winning_cells(b):
+    """Cells (occupied or not) that would give the single-player bitboard `b` 4 in a row"""
+    cells = 0
+    for shift in DIRECTIONS:
+        # the new chip is at one end of the line...
+        cells |= (b >> shift) & (b >> (2 * shift)) & (b >> (3 * shift))
+        cells |= (b << shift) & (b << (2 * shift)) & (b << (3 * shift))
+        # ...or fills a gap inside it
+        cells |= (b << shift) & (b >> shift) & (b >> (2 * shift))
+        cells |= (b << (2 * shift)) & (b << shift) & (b >> shift)
+    return cells & BOARD_MASK
+
+@njit(cache=True)
+def is_win(b):
+    """Check if the single-player bitboard `b` contains 4 in a row"""
+    for shift in DIRECTIONS:
+        x = b & (b >> shift)
+        if x & (x >> (2 * shift)):
+            return True
+    return False
+
+@njit(cache=True)
+def is_full(bb):
+    """Check if every cell is occupied"""
+    return bb[0] | bb[1] == BOARD_MASK
+
+@njit(cache=True)
+def is_terminal(bb):
+    """Check if the game is over (either player won or the board is full)"""
+    return is_win(bb[0]) or is_win(bb[1]) or is_full(bb)
+
+@njit(cache=True)
+def count_runs(b, n):
+    """Counts `n`-in-a-row sequences in `b` (same as Connect4AI.in_a_row)"""
+    count = 0
+    for shift in DIRECTIONS:
+        x = b
+        for i in range(1, n):
+            x &= b >> (i * shift)
+        count += popcount(x)
+    return count
+
+@njit(cache=True)
+def count_potential_wins(b, empty):
+    """Counts 4-cell windows with 3 of `b`'s chips and 1 empty cell"""
+    count = 0
+    for shift in DIRECTIONS:
+        b1, b2, b3 = b >> shift, b >> (2 * shift), b >> (3 * shift)
+        e1, e2, e3 = empty >> shift, empty >> (2 * shift), empty >> (3 * shift)
+        count += popcount((empty & b1 & b2 & b3) |
+                          (b & e1 & b2 & b3) |
+                          (b & b1 & e2 & b3) |
+                          (b & b1 & b2 & e3))
+    return count
+
+@njit(cache=True)
+def heuristic_score(bb, player_id):
+    """Bitboard version of HeuristicAI.heuristic_score from `player_id`'s point of view"""
+    me = bb[player_id - 1]
+    opp = bb[2 - player_id]
+
+    if is_win(me):
+        return 10000
+    if is_win(opp):
+        return -10000
+
+    score = 1000 * (count_runs(me, 3) - count_runs(opp, 3))
+    score += 100 * (count_runs(me, 2) - count_runs(opp, 2))
+    score += 10 * (popcount(me & CENTER_MASK) - popcount(opp & CENTER_MASK))
+
+    empty = BOARD_MASK & ~(me | opp)
+    score += 50 * (count_potential_wins(me, empty) - count_potential_wins(opp, empty))
+    return score
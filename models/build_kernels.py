@@ -0,0 +1,32 @@
+"""
+Ahead-of-time compile the minimax searches into a native extension module
+so that MinimaxAI / MinimaxABAI start without waiting for numba's JIT.
+
+Usage: python -m models.build_kernels
+"""
+
+from numba.pycc import CC
+from . import minimax_ab_ai, minimax_ai
+from .aot_kernels import MODELS_DIR, source_fingerprint
+
+cc = CC("minimax_kernels")
+cc.output_dir = MODELS_DIR
+
+# Baked into the extension so stale builds can be detected at import time
+FINGERPRINT = source_fingerprint()
+
+@cc.export("fingerprint", "i8()")
+def fingerprint():
+    return FINGERPRINT
+
+@cc.export("alphabeta", "i8(i8, i8, i8, b1, i8, i8, i8, i8[:, :], i8[:])")
+def alphabeta(bb0, bb1, depth, is_maximizing, alpha, beta, player_id, tt, nodes):
+    return minimax_ab_ai.alphabeta_entry(bb0, bb1, depth, is_maximizing, alpha, beta, player_id, tt, nodes)
+
+@cc.export("minimax_search", "i8(i8, i8, i8, b1, i8, i8[:, :], i8[:])")
+def minimax_search(bb0, bb1, depth, is_maximizing, player_id, tt, nodes):
+    return minimax_ai.minimax_entry(bb0, bb1, depth, is_maximizing, player_id, tt, nodes)
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Compiled minimax kernels into {MODELS_DIR}")
@@ -6,6 +6,55 @@ This module implements the HeuristicAI class using simple heuristic evaluation
 import numpy as np
 from .base_ai import Connect4AI
 
+BOARD_HEIGHT = 6
+BOARD_WIDTH = 7
+
+def window_indices(n):
+    """
+    Flat (row * BOARD_WIDTH + col) indices of every `n`-cell line on the board:
+    horizontal, vertical, and both diagonals. Returns an (num_windows, n) array.
+    """
+    windows = []
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for row in range(BOARD_HEIGHT):
+            for col in range(BOARD_WIDTH):
+                end_row = row + dr * (n - 1)
+                end_col = col + dc * (n - 1)
+                if 0 <= end_row < BOARD_HEIGHT and 0 <= end_col < BOARD_WIDTH:
+                    windows.append([(row + dr * i) * BOARD_WIDTH + col + dc * i for i in range(n)])
+    return np.array(windows, dtype=np.int32)
+
+# Gather tables for all 2-, 3- and 4-cell windows (131, 98 and 69 windows)
+WINDOWS_2 = window_indices(2)
+WINDOWS_3 = window_indices(3)
+WINDOWS_4 = window_indices(4)
+
+# A window of cells (each 0, 1 or 2) is packed into one base-3 number,
+# e.g. a 4-cell window (a, b, c, d) becomes a + 3b + 9c + 27d in [0, 81)
+PACK = np.array([1, 3, 9, 27], dtype=np.int32)
+
+def packed_line(player_id, n):
+    """Packed value of an `n`-cell window filled entirely by `player_id`"""
+    return player_id * int(PACK[:n].sum())
+
+def window_score(window, player_id):
+    """Score of a single 4-cell window: 3 chips with the 4th cell empty is a potential win"""
+    opponent_id = 2 if player_id == 1 else 1
+    if window.count(0) != 1:
+        return 0
+    if window.count(player_id) == 3:
+        return 50
+    if window.count(opponent_id) == 3:
+        return -50
+    return 0
+
+# Score of every packed 4-cell window, from each player's point of view
+SCORE_TABLE = np.zeros((3, 81), dtype=np.int16)
+for _player_id in (1, 2):
+    for _packed in range(81):
+        _window = [(_packed // 3 ** i) % 3 for i in range(4)]
+        SCORE_TABLE[_player_id, _packed] = window_score(_window, _player_id)
+
 class HeuristicAI(Connect4AI):
     """Simple Heuristic-based AI for Connect 4"""
 
@@ -32,40 +81,36 @@ class HeuristicAI(Connect4AI):
 
     def heuristic_score(self, board):
         """generates a score the given `board` based on Connect4 heuristics"""
-        score = 0
-        
+        me = self.player_id
+        opp = self.get_opponent_id()
+        cells = board.ravel()
+
+        # pack every 4-cell window into a single base-3 index
+        packed_4 = cells[WINDOWS_4] @ PACK
+
         # 1. check if you won
-        if self.check_win(board, self.player_id):
+        if (packed_4 == packed_line(me, 4)).any():
             return 10000
         # 2. check if your opponent won
-        if self.check_win(board, self.get_opponent_id()):
+        if (packed_4 == packed_line(opp, 4)).any():
             return -10000  # Loss
-        
+
         # 3. count 3 in a rows. the more, teh better
-        my_sequences = self.in_a_row(3, board, self.player_id)
-        opp_sequences = self.in_a_row(3, board, self.get_opponent_id())
-        
-        score += len(my_sequences) * 1000
-        score -= len(opp_sequences) * 1000
-        
+        packed_3 = cells[WINDOWS_3] @ PACK[:3]
+        score = int((packed_3 == packed_line(me, 3)).sum()) * 1000
+        score -= int((packed_3 == packed_line(opp, 3)).sum()) * 1000
+
         # 4. count 2 in a rows. the more, the better
-        my_2_sequences = self.in_a_row(2, board, self.player_id)
-        opp_2_sequences = self.in_a_row(2, board, self.get_opponent_id())
-        
-        score += len(my_2_sequences) * 100
-        score -= len(opp_2_sequences) * 100
-        
+        packed_2 = cells[WINDOWS_2] @ PACK[:2]
+        score += int((packed_2 == packed_line(me, 2)).sum()) * 100
+        score -= int((packed_2 == packed_line(opp, 2)).sum()) * 100
+
         # 5. the closer the placement is to the center, the better
-        center_cols = [2, 3, 4]
-        for row in range(board.shape[0]):
-            for col in center_cols:
-                if board[row][col] == self.player_id:
-                    score += 10
-                elif board[row][col] == self.get_opponent_id():
-                    score -= 10
-        
+        center = board[:, 2:5]
+        score += int((center == me).sum()) * 10
+        score -= int((center == opp).sum()) * 10
+
         # Look for potential 4-in-a-row opportunities
-        score += self.count_potential_wins(board, self.player_id) * 50
-        score -= self.count_potential_wins(board, self.get_opponent_id()) * 50
-        
-        return score
\ No newline at end of file
+        score += int(SCORE_TABLE[me, packed_4].sum())
+
+        return score
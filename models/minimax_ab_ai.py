@@ -2,8 +2,136 @@
 Minimax AI with Alpha-Beta Pruning for Connect 4 Game
 """
 
+import numpy as np
+from numba import njit
+from .aot_kernels import load_aot_kernels
 from .base_ai import Connect4AI
-from .heuristic_ai import HeuristicAI
+from .bitboard import (COLUMN_MASK, board_to_bb, can_play, heuristic_score, is_terminal, play,
+                       position_key, possible_moves, valid_columns, winning_cells)
+
+# Larger than any heuristic score, used as the initial alpha/beta window
+INF = 1_000_000
+
+# Heuristic score of a won position (see heuristic_score)
+WIN_SCORE = 10000
+
+# Center-out column order: central moves are usually best, so searching them
+# first tightens alpha/beta early and triggers more cutoffs
+MOVE_ORDER = (3, 2, 4, 1, 5, 0, 6)
+
+# Transposition table entry flags
+EXACT = 0  # stored value is the exact minimax value
+LOWER = 1  # stored value is a lower bound (search failed high)
+UPPER = 2  # stored value is an upper bound (search failed low)
+
+# Transposition table layout: one row per slot (prime size so keys spread evenly)
+TT_SIZE = 262139
+TT_KEY, TT_VALUE, TT_DEPTH, TT_FLAG, TT_MOVE = 0, 1, 2, 3, 4
+
+def new_transposition_table():
+    """Allocate an empty transposition table for the jitted searches"""
+    return np.full((TT_SIZE, 5), -1, dtype=np.int64)
+
+@njit(cache=True)
+def tt_store(tt, key, value, depth, flag, move):
+    """Store a search result, always replacing whatever was in the slot"""
+    slot = key % TT_SIZE
+    tt[slot, TT_KEY] = key
+    tt[slot, TT_VALUE] = value
+    tt[slot, TT_DEPTH] = depth
+    tt[slot, TT_FLAG] = flag
+    tt[slot, TT_MOVE] = move
+
+@njit(cache=True)
+def alphabeta(bb, depth, is_maximizing, alpha, beta, player_id, tt, nodes):
+    """
+    Minimax with alpha-beta pruning and a transposition table, scored for `player_id`.
+    The best move found for each position is stored in the table (TT_MOVE).
+    """
+    nodes[0] += 1
+
+    # Probe the transposition table for a result searched at least this deep
+    key = position_key(bb)
+    slot = key % TT_SIZE
+    tt_move = -1
+    if tt[slot, TT_KEY] == key:
+        tt_move = tt[slot, TT_MOVE]
+        if tt[slot, TT_DEPTH] >= depth:
+            value = tt[slot, TT_VALUE]
+            flag = tt[slot, TT_FLAG]
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+    # Base case: check if game is terminal or depth limit reached
+    if depth == 0 or is_terminal(bb):
+        value = heuristic_score(bb, player_id)
+        tt_store(tt, key, value, depth, EXACT, -1)
+        return value
+
+    mover = player_id if is_maximizing else 3 - player_id
+
+    # If the side to move can connect four right now, that is its best move:
+    # score the win directly instead of searching any children
+    wins = winning_cells(bb[mover - 1]) & possible_moves(bb)
+    if wins:
+        value = WIN_SCORE if is_maximizing else -WIN_SCORE
+        for col in MOVE_ORDER:
+            if wins & COLUMN_MASK[col]:
+                tt_store(tt, key, value, depth, EXACT, col)
+                return value
+
+    alpha_orig, beta_orig = alpha, beta
+    value = -INF if is_maximizing else INF
+    best_move = -1
+
+    for i in range(len(MOVE_ORDER) + 1):
+        # Try the best move from an earlier search first, then center-out
+        col = tt_move if i == 0 else MOVE_ORDER[i - 1]
+        if col < 0 or (i > 0 and col == tt_move) or not can_play(bb, col):
+            continue
+
+        score = alphabeta(play(bb, col, mover), depth - 1, not is_maximizing, alpha, beta, player_id, tt, nodes)
+        if is_maximizing:
+            # Maximizing player (AI)
+            if score > value:
+                value = score
+                best_move = col
+            alpha = max(alpha, score)
+        else:
+            # Minimizing player (opponent)
+            if score < value:
+                value = score
+                best_move = col
+            beta = min(beta, score)
+
+        # Alpha-beta pruning: if alpha >= beta, prune remaining branches
+        if alpha >= beta:
+            break
+
+    # Store the result along with how it relates to the searched window
+    if value <= alpha_orig:
+        flag = UPPER
+    elif value >= beta_orig:
+        flag = LOWER
+    else:
+        flag = EXACT
+    tt_store(tt, key, value, depth, flag, best_move)
+    return value
+
+@njit(cache=True)
+def alphabeta_entry(bb0, bb1, depth, is_maximizing, alpha, beta, player_id, tt, nodes):
+    """Entry point for `alphabeta` taking plain integers (the signature compiled by build_kernels)"""
+    return alphabeta((bb0, bb1), depth, is_maximizing, alpha, beta, player_id, tt, nodes)
+
+# Prefer the ahead-of-time compiled kernels when they have been built
+AOT_KERNELS = load_aot_kernels()
+alphabeta_search = AOT_KERNELS.alphabeta if AOT_KERNELS is not None else alphabeta_entry
 
 class MinimaxABAI(Connect4AI):
     """Minimax AI with Alpha-Beta pruning for Connect 4"""
@@ -12,91 +140,45 @@ class MinimaxABAI(Connect4AI):
         super().__init__(player_id)
         self.depth = depth
         self.opponent_id = 2 if player_id == 1 else 1
-        
-        self.heuristic_evaluator = HeuristicAI(player_id)
+
+        # Allocated on the first search (~10 MB), so unused agents stay cheap
+        self.tt = None
+        # Searched node count (a 1-element array so the compiled search can update it)
+        self.nodes = np.zeros(1, dtype=np.int64)
 
     def get_move(self, board):
-        """Get the best move using minimax algorithm with alpha-beta pruning"""
-        valid_columns = self.get_valid_columns(board)
+        """Get the best move using iterative deepening alpha-beta search"""
+        bb = board_to_bb(board)
+        valid_cols = valid_columns(bb)
         
-        if not valid_columns:
+        if not valid_cols:
             return 0 
-        
-        best_score = float('-inf')
-        best_column = valid_columns[0]
-        alpha = float('-inf')  # Best score for maximizing player
-        beta = float('inf')    # Best score for minimizing player
-        
-        for col in valid_columns:
-            # Simulate the move
-            new_board = self.simulate_move_for_player(board, col, self.player_id)
-            
-            # Get the score for this move using minimax with alpha-beta pruning
-            score = self.minimax_ab(new_board, self.depth - 1, False, alpha, beta)
-            
-            if score > best_score:
-                best_score = score
-                best_column = col
-            
-            alpha = max(alpha, score)  # Update alpha with best score found so far
-        
-        return best_column
-    
-    def minimax_ab(self, board, depth, is_maximizing, alpha, beta):
-        """Minimax algorithm with alpha-beta pruning"""
-        # Base case: check if game is terminal or depth limit reached
-        if depth == 0 or self.is_terminal_node(board):
-            return self.heuristic_evaluator.heuristic_score(board)
-        
-        valid_columns = self.get_valid_columns(board)
-        
-        if is_maximizing:
-            # Maximizing player (AI)
-            max_score = float('-inf')
-            for col in valid_columns:
-                new_board = self.simulate_move_for_player(board, col, self.player_id)
-                score = self.minimax_ab(new_board, depth - 1, False, alpha, beta)
-                max_score = max(max_score, score)
-                alpha = max(alpha, score) 
-                
-                # Alpha-beta pruning: if alpha >= beta, prune remaining branches
-                if alpha >= beta:
-                    break 
-                    
-            return max_score
-        else:
-            # Minimizing player (opponent)
-            min_score = float('inf')
-            for col in valid_columns:
-                new_board = self.simulate_move_for_player(board, col, self.opponent_id)
-                score = self.minimax_ab(new_board, depth - 1, True, alpha, beta)
-                min_score = min(min_score, score)
-                beta = min(beta, score)  
-                
-                # Alpha-beta pruning: if alpha >= beta, prune remaining branches
-                if alpha >= beta:
-                    break 
-                    
-            return min_score
-    
-    def simulate_move_for_player(self, board, col, player):
-        """Simulate a move for any player and return the new board state"""
-        new_board = board.copy()
-        
-        # Find the lowest empty row in the column
-        for row in range(5, -1, -1):  
-            if new_board[row][col] == 0:
-                new_board[row][col] = player
-                break
-        
-        return new_board
-    
-    def get_valid_columns(self, board):
-        """Get all valid columns for moves"""
-        return [col for col in range(7) if board[0][col] == 0]
+
+        # Search depth 1, 2, ..., self.depth. Each iteration leaves its best
+        # moves in the transposition table, so the next, deeper iteration
+        # searches them first and prunes much more of the tree.
+        for depth in range(1, self.depth + 1):
+            self.minimax_ab(bb, depth, True, -INF, INF)
+
+        # The root's entry holds the best move, unless another position has replaced it
+        key = position_key(bb)
+        entry = self.transposition_table()[key % TT_SIZE]
+        best_column = entry[TT_MOVE]
+        if entry[TT_KEY] != key or best_column not in valid_cols:
+            return valid_cols[0]
+        return int(best_column)
     
-    def is_terminal_node(self, board):
-        """Check if the game is in a terminal state"""
-        return (self.check_win(board, self.player_id) or 
-                self.check_win(board, self.opponent_id) or 
-                len(self.get_valid_columns(board)) == 0)
+    def reset_search(self):
+        """Forget earlier searches, so the next move doesn't depend on them"""
+        if self.tt is not None:
+            self.tt.fill(-1)
+
+    def transposition_table(self):
+        """The search's transposition table, allocated on first use"""
+        if self.tt is None:
+            self.tt = new_transposition_table()
+        return self.tt
+
+    def minimax_ab(self, bb, depth, is_maximizing, alpha, beta):
+        """Minimax algorithm with alpha-beta pruning (runs the compiled search)"""
+        return alphabeta_search(bb[0], bb[1], depth, is_maximizing, alpha, beta, self.player_id, self.transposition_table(), self.nodes)
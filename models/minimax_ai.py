@@ -2,8 +2,53 @@
 Minimax AI without Alpha-Beta Pruning for Connect 4 Game
 """
 
+import numpy as np
+from numba import njit
 from .base_ai import Connect4AI
-from .heuristic_ai import HeuristicAI
+from .bitboard import BOARD_WIDTH, board_to_bb, can_play, heuristic_score, is_terminal, play, position_key, valid_columns
+from .minimax_ab_ai import AOT_KERNELS, EXACT, INF, TT_DEPTH, TT_KEY, TT_SIZE, TT_VALUE, new_transposition_table, tt_store
+
+@njit(cache=True)
+def minimax_search(bb, depth, is_maximizing, player_id, tt, nodes):
+    """Depth-limited minimax with a transposition table, scored for `player_id`"""
+    nodes[0] += 1
+
+    # Reuse a result for this position searched at least this deep
+    key = position_key(bb)
+    slot = key % TT_SIZE
+    if tt[slot, TT_KEY] == key and tt[slot, TT_DEPTH] >= depth:
+        return tt[slot, TT_VALUE]
+
+    # Base case: check if game is terminal or depth limit reached
+    if depth == 0 or is_terminal(bb):
+        value = heuristic_score(bb, player_id)
+        tt_store(tt, key, value, depth, EXACT, -1)
+        return value
+
+    if is_maximizing:
+        # Maximizing player (AI)
+        value = -INF
+        for col in range(BOARD_WIDTH):
+            if can_play(bb, col):
+                value = max(value, minimax_search(play(bb, col, player_id), depth - 1, not is_maximizing, player_id, tt, nodes))
+    else:
+        # Minimizing player (opponent)
+        value = INF
+        for col in range(BOARD_WIDTH):
+            if can_play(bb, col):
+                value = min(value, minimax_search(play(bb, col, 3 - player_id), depth - 1, not is_maximizing, player_id, tt, nodes))
+
+    # Without pruning every stored value is exact
+    tt_store(tt, key, value, depth, EXACT, -1)
+    return value
+
+@njit(cache=True)
+def minimax_entry(bb0, bb1, depth, is_maximizing, player_id, tt, nodes):
+    """Entry point for `minimax_search` taking plain integers (the signature compiled by build_kernels)"""
+    return minimax_search((bb0, bb1), depth, is_maximizing, player_id, tt, nodes)
+
+# Prefer the ahead-of-time compiled kernel when it has been built
+minimax_kernel = AOT_KERNELS.minimax_search if AOT_KERNELS is not None else minimax_entry
 
 class MinimaxAI(Connect4AI):
     """Minimax AI without Alpha-Beta pruning for Connect 4"""
@@ -12,25 +57,29 @@ class MinimaxAI(Connect4AI):
         super().__init__(player_id)
         self.depth = depth
         self.opponent_id = 2 if player_id == 1 else 1
-        
-        self.heuristic_evaluator = HeuristicAI(player_id)
+
+        # Allocated on the first search (~10 MB), so unused agents stay cheap
+        self.tt = None
+        # Searched node count (a 1-element array so the compiled search can update it)
+        self.nodes = np.zeros(1, dtype=np.int64)
 
     def get_move(self, board):
         """Get the best move using minimax algorithm"""
-        valid_columns = self.get_valid_columns(board)
+        bb = board_to_bb(board)
+        valid_cols = valid_columns(bb)
         
-        if not valid_columns:
+        if not valid_cols:
             return 0  
         
-        best_score = float('-inf')
-        best_column = valid_columns[0]
+        best_score = -INF
+        best_column = valid_cols[0]
         
-        for col in valid_columns:
+        for col in valid_cols:
             # Simulate the move
-            new_board = self.simulate_move_for_player(board, col, self.player_id)
+            new_bb = play(bb, col, self.player_id)
             
             # Get the score for this move using minimax
-            score = self.minimax(new_board, self.depth - 1, False)
+            score = self.minimax(new_bb, self.depth - 1, False)
             
             if score > best_score:
                 best_score = score
@@ -38,49 +87,17 @@ class MinimaxAI(Connect4AI):
         
         return best_column
     
-    def minimax(self, board, depth, is_maximizing):
-        """Minimax algorithm with depth limiting"""
-        # Base case: check if game is terminal or depth limit reached
-        if depth == 0 or self.is_terminal_node(board):
-            return self.heuristic_evaluator.heuristic_score(board)
-        
-        valid_columns = self.get_valid_columns(board)
-        
-        if is_maximizing:
-            # Maximizing player (AI)
-            max_score = float('-inf')
-            for col in valid_columns:
-                new_board = self.simulate_move_for_player(board, col, self.player_id)
-                score = self.minimax(new_board, depth - 1, False)
-                max_score = max(max_score, score)
-            return max_score
-        else:
-            # Minimizing player (opponent)
-            min_score = float('inf')
-            for col in valid_columns:
-                new_board = self.simulate_move_for_player(board, col, self.opponent_id)
-                score = self.minimax(new_board, depth - 1, True)
-                min_score = min(min_score, score)
-            return min_score
-    
-    def simulate_move_for_player(self, board, col, player):
-        """Simulate a move for any player and return the new board state"""
-        new_board = board.copy()
-        
-        # Find the lowest empty row in the column
-        for row in range(5, -1, -1): 
-            if new_board[row][col] == 0:
-                new_board[row][col] = player
-                break
-        
-        return new_board
-    
-    def get_valid_columns(self, board):
-        """Get all valid columns for moves"""
-        return [col for col in range(7) if board[0][col] == 0]
-    
-    def is_terminal_node(self, board):
-        """Check if the game is in a terminal state"""
-        return (self.check_win(board, self.player_id) or 
-                self.check_win(board, self.opponent_id) or 
-                len(self.get_valid_columns(board)) == 0)
+    def reset_search(self):
+        """Forget earlier searches, so the next move doesn't depend on them"""
+        if self.tt is not None:
+            self.tt.fill(-1)
+
+    def transposition_table(self):
+        """The search's transposition table, allocated on first use"""
+        if self.tt is None:
+            self.tt = new_transposition_table()
+        return self.tt
+
+    def minimax(self, bb, depth, is_maximizing):
+        """Minimax algorithm with depth limiting (runs the compiled search)"""
+        return minimax_kernel(bb[0], bb[1], depth, is_maximizing, self.player_id, self.transposition_table(), self.nodes)
@@ -1,6 +1,9 @@
 import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
 import torch.nn as nn
 import torch.optim as optim
+import queue as queue_module
 import random
 import numpy as np
 from typing import List, Tuple, Optional
@@ -363,6 +366,26 @@ class CNNRLAI(Connect4AI):
         if self.training_steps % self.target_update_freq == 0:
             self.target_network.load_state_dict(self.policy_network.state_dict())
         
+    def learn(self,
+              state_np: np.ndarray,
+              action: int,
+              reward: float,
+              next_state_np: np.ndarray,
+              done: bool):
+        """
+        Store a transition and perform one gradient step.
+        """
+        self.store_transition(state_np, action, reward, next_state_np, done)
+        self.train_step()
+
+    def learn_on_batch(self, transitions: List[Tuple[np.ndarray, int, float, np.ndarray, bool]]):
+        """
+        Learn from a batch of transitions produced elsewhere (e.g. by an actor process),
+        one gradient step per transition as in train().
+        """
+        for transition in transitions:
+            self.learn(*transition)
+
     def get_move(self, board: np.ndarray) -> int:
         """
         Used by the game (demo.py): choose the best move (no exploration)
@@ -382,10 +405,109 @@ class CNNRLAI(Connect4AI):
         """
         return np.stack([state_np[1], state_np[0]], axis=0)
     
+    def play_episode(self, mode: str, on_transition) -> Tuple[Optional[int], float]:
+        """
+        Play one training game against the opponent selected by `mode`.
+        Every DQN transition (s, a, r, s', done) is passed to `on_transition` as it happens.
+        Returns (winner, episode_reward), winner = 0 for a draw.
+        """
+        opp_id = 3 - self.player_id
+        board = np.zeros((self.rows, self.cols), dtype=int)
+        done = False
+        winner = None
+        moves_played = 0
+        episode_reward = 0.0
+
+        while not done:
+            # RL agent's turn
+            state_np = self.encode_board_np(board)  # For replay
+
+            # Choose action for training
+            action = self.select_action_training(board)
+            prev_board = board.copy()
+            row = self.find_drop_row(prev_board, action)
+            board_after_our_move = self.simulate_move(board, action, self.player_id)
+            moves_played += 1
+
+            # Shaping reward from just our move
+            
+            reward = self.local_reward(prev_board, board_after_our_move, action, row)
+
+            # Check for win
+            if self.check_win(board_after_our_move, self.player_id):
+                winner = self.player_id
+                done = True
+                reward += 2.0 # Win reward
+                max_moves = self.rows * self.cols # 42
+                remaining_cells = max(0, max_moves - moves_played)
+                reward += 0.5 * (remaining_cells / max_moves) # Reward winning with less moves
+
+                next_state_np = self.encode_board_np(board_after_our_move)
+                on_transition(state_np, action, reward, next_state_np, True)
+                episode_reward += reward
+                board = board_after_our_move
+                break
+
+            # Board full after our move = draw
+            if np.all(board_after_our_move[0] != 0):
+                winner = 0
+                done = True
+                reward += 0.5 # Draw reward
+                next_state_np = self.encode_board_np(board_after_our_move)
+                on_transition(state_np, action, reward, next_state_np, True)
+                episode_reward += reward
+                board = board_after_our_move
+                break
+            
+            # Opponent's turn
+            if mode == "random":
+                opp_valid_moves = self.get_valid_moves(board_after_our_move)
+                opp_action = random.choice(opp_valid_moves)
+            elif mode == "self":
+                opp_action = self.select_action_selfplay(board_after_our_move)
+            elif mode == "heuristic":
+                opp_action = self.heuristic_opponent.get_move(board_after_our_move)
+            else:
+                raise NotImplementedError("Selected mode not implemented for CNN-RL")
+            board_after_opp_move = self.simulate_move(board_after_our_move, opp_action, opp_id)
+            moves_played += 1
+
+            # Check if opponent won
+            if self.check_win(board_after_opp_move, opp_id):
+                winner = opp_id
+                done = True
+                reward -= 2.0  # Loss penalty
+                next_state_np = self.encode_board_np(board_after_opp_move)
+                on_transition(state_np, action, reward, next_state_np, True)
+                episode_reward += reward
+                board = board_after_opp_move
+                break
+
+            # Board full after opponent's move = draw
+            if np.all(board_after_opp_move[0] != 0):
+                winner = 0
+                done = True
+                reward += 0.3
+                next_state_np = self.encode_board_np(board_after_opp_move)
+                on_transition(state_np, action, reward, next_state_np, True)
+                episode_reward += reward
+                board = board_after_opp_move
+                break
+
+            # Otherwise, continue game
+            next_state_np = self.encode_board_np(board_after_opp_move)
+            on_transition(state_np, action, reward, next_state_np, False)
+            episode_reward += reward
+            board = board_after_opp_move
+
+        return winner, episode_reward
+
     def train(self,
               num_games: int = 10000,
               mode: str = "random",
-              print_chunks: int = 100):
+              print_chunks: int = 100,
+              sync_every: int = 0,
+              history_path: Optional[str] = None):
         """
         Train the CNN RL agent with a self-contained simulation.
         
@@ -399,6 +521,10 @@ class CNNRLAI(Connect4AI):
         - Opponent moves
         - Reward is shaping + terminal
         - Each step yields a DQN transition (s, a, r, s', done)
+
+        When torch.distributed is initialized, every process plays its own games and
+        the policy networks are averaged every `sync_every` games (and once at the end).
+        `history_path` overrides where the reward history is saved.
         """
 
         print(f"Training CNN RL for {num_games} games | Mode = {mode} | Epsilon Decay = {self.epsilon_decay} | Device = {self.device}")
@@ -406,107 +532,14 @@ class CNNRLAI(Connect4AI):
         wins = 0
         losses = 0
         draws = 0
-        opp_id = 3 - self.player_id
         # Chunk stats for progress printing
         chunk_wins = 0
         chunk_losses = 0
         chunk_draws = 0
 
         for game in range(num_games):
-            board = np.zeros((self.rows, self.cols), dtype=int)
-            done = False
-            winner = None
-            moves_played = 0
-            episode_reward = 0.0
-
-            while not done:
-                # RL agent's turn
-                state_np = self.encode_board_np(board)  # For replay
-                state_tensor = torch.from_numpy(state_np).float().to(self.device)
-
-                # Choose action for training
-                action = self.select_action_training(board)
-                prev_board = board.copy()
-                row = self.find_drop_row(prev_board, action)
-                board_after_our_move = self.simulate_move(board, action, self.player_id)
-                moves_played += 1
-
-                # Shaping reward from just our move
-                
-                reward = self.local_reward(prev_board, board_after_our_move, action, row)
-
-                # Check for win
-                if self.check_win(board_after_our_move, self.player_id):
-                    winner = self.player_id
-                    done = True
-                    reward += 2.0 # Win reward
-                    max_moves = self.rows * self.cols # 42
-                    remaining_cells = max(0, max_moves - moves_played)
-                    reward += 0.5 * (remaining_cells / max_moves) # Reward winning with less moves
-
-                    next_state_np = self.encode_board_np(board_after_our_move)
-                    self.store_transition(state_np, action, reward, next_state_np, True)
-                    self.train_step()
-                    episode_reward += reward
-                    board = board_after_our_move
-                    break
-
-                # Board full after our move = draw
-                if np.all(board_after_our_move[0] != 0):
-                    winner = 0
-                    done = True
-                    reward += 0.5 # Draw reward
-                    next_state_np = self.encode_board_np(board_after_our_move)
-                    self.store_transition(state_np, action, reward, next_state_np, True)
-                    self.train_step()
-                    episode_reward += reward
-                    board = board_after_our_move
-                    break
-                
-                # Opponent's turn
-                if mode == "random":
-                    opp_valid_moves = self.get_valid_moves(board_after_our_move)
-                    opp_action = random.choice(opp_valid_moves)
-                elif mode == "self":
-                    opp_action = self.select_action_selfplay(board_after_our_move)
-                elif mode == "heuristic":
-                    opp_action = self.heuristic_opponent.get_move(board_after_our_move)
-                else:
-                    raise NotImplementedError("Selected mode not implemented for CNN-RL")
-                board_after_opp_move = self.simulate_move(board_after_our_move, opp_action, opp_id)
-                moves_played += 1
-
-                # Check if opponent won
-                if self.check_win(board_after_opp_move, opp_id):
-                    winner = opp_id
-                    done = True
-                    reward -= 2.0  # Loss penalty
-                    next_state_np = self.encode_board_np(board_after_opp_move)
-                    self.store_transition(state_np, action, reward, next_state_np, True)
-                    self.train_step()
-                    episode_reward += reward
-                    board = board_after_opp_move
-                    break
-
-                # Board full after opponent's move = draw
-                if np.all(board_after_opp_move[0] != 0):
-                    winner = 0
-                    done = True
-                    reward += 0.3
-                    next_state_np = self.encode_board_np(board_after_opp_move)
-                    self.store_transition(state_np, action, reward, next_state_np, True)
-                    self.train_step()
-                    episode_reward += reward
-                    board = board_after_opp_move
-                    break
-
-                # Otherwise, continue game
-                next_state_np = self.encode_board_np(board_after_opp_move)
-                self.store_transition(state_np, action, reward, next_state_np, False)
-                self.train_step()
-                episode_reward += reward
-                board = board_after_opp_move
-            
+            winner, episode_reward = self.play_episode(mode, self.learn)
+
             # Game over, update stats and decay epsilon
             if winner == self.player_id:
                 wins += 1
@@ -524,6 +557,10 @@ class CNNRLAI(Connect4AI):
             # Decay epsilon
             self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
 
+            # Every process plays the same number of games, so these collectives line up
+            if sync_every and (game + 1) % sync_every == 0:
+                self.average_across_processes()
+
             # Progress print
             chunk = max(1, num_games // print_chunks)
             chunk_total = chunk_wins + chunk_losses + chunk_draws
@@ -540,6 +577,85 @@ class CNNRLAI(Connect4AI):
                 chunk_losses = 0
                 chunk_draws = 0
             
+        print(f"\n[TRAINING COMPLETE] CNN RL finished {num_games} games | Mode: {mode} | Epsilon decay: {self.epsilon_decay}")
+        print(f"Final stats: W={wins}, L={losses}, D={draws}")
+        if sync_every and num_games % sync_every != 0:
+            self.average_across_processes()
+        if dist.is_initialized() and dist.get_rank() != 0:
+            return
+        if history_path is None:
+            history_path = f"training_history/training_{num_games}_{mode}_{self.epsilon_decay}.npz"
+        self.save_training_history(history_path)
+
+    def train_with_actors(self,
+                          num_games: int = 10000,
+                          mode: str = "random",
+                          num_actors: int = 4,
+                          sync_every: int = 10,
+                          print_chunks: int = 100):
+        """
+        Train with `num_actors` CPU actor processes playing the games while this
+        process (the learner) only takes gradient steps on the transitions they send.
+        Actors read a shared-memory copy of the policy network that the learner
+        refreshes every `sync_every` games.
+        """
+        if num_actors < 1:
+            raise ValueError(f"num_actors must be at least 1, got {num_actors}")
+
+        print(f"Training CNN RL for {num_games} games with {num_actors} actors | Mode = {mode} | Epsilon Decay = {self.epsilon_decay} | Device = {self.device}")
+
+        shared_network = Connect4CNN()
+        shared_network.load_state_dict(self.policy_network.state_dict())
+        shared_network.share_memory()
+
+        # Actors decay epsilon `num_actors` times faster so the overall schedule matches train()
+        ctx = mp.get_context("spawn")
+        queue = ctx.Queue(maxsize=2 * num_actors)
+        actors = [ctx.Process(target=run_actor,
+                              args=(shared_network, self.player_id, mode,
+                                    num_games // num_actors + (i < num_games % num_actors),
+                                    self.epsilon, self.epsilon_decay ** num_actors, queue))
+                  for i in range(num_actors)]
+        for actor in actors:
+            actor.start()
+
+        wins = 0
+        losses = 0
+        draws = 0
+        chunk = max(1, num_games // print_chunks)
+        try:
+            for game in range(num_games):
+                transitions, winner, episode_reward = receive_from_actors(queue, actors)
+                self.learn_on_batch(transitions)
+
+                if winner == self.player_id:
+                    wins += 1
+                elif winner == 0:
+                    draws += 1
+                else:
+                    losses += 1
+                self.update_reward_tracking(episode_reward)
+                self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+
+                if (game + 1) % sync_every == 0:
+                    shared_network.load_state_dict(self.policy_network.state_dict())
+
+                if (game + 1) % chunk == 0:
+                    print(
+                        f"[{game + 1}/{num_games}] "
+                        f"Epsilon = {self.epsilon:.3f} | "
+                        f"W/L/D = {wins}/{losses}/{draws} | "
+                        f"Avg Reward (last 100) = {self.moving_avg_rewards[-1]:.3f}"
+                    )
+        except BaseException:
+            # Don't leave actors running (or blocked on a full queue) after a failure
+            for actor in actors:
+                actor.terminate()
+            raise
+        finally:
+            for actor in actors:
+                actor.join()
+
         print(f"\n[TRAINING COMPLETE] CNN RL finished {num_games} games | Mode: {mode} | Epsilon decay: {self.epsilon_decay}")
         print(f"Final stats: W={wins}, L={losses}, D={draws}")
         self.save_training_history(f"training_history/training_{num_games}_{mode}_{self.epsilon_decay}.npz")
@@ -566,6 +682,18 @@ class CNNRLAI(Connect4AI):
         """
         return any(torch.isnan(p).any() for p in self.policy_network.parameters())
 
+    def average_across_processes(self):
+        """
+        Average the policy network weights over all torch.distributed processes
+        """
+        if not dist.is_initialized():
+            return
+        world_size = dist.get_world_size()
+        with torch.no_grad():
+            for param in self.policy_network.parameters():
+                dist.all_reduce(param, op=dist.ReduceOp.SUM)
+                param /= world_size
+
     def save_training_history(self, path: str):
         """
         Save training reward history to a .npz file for plotting later
@@ -576,16 +704,34 @@ class CNNRLAI(Connect4AI):
         print(f"Saved training history to {path}")
 
     
+    def reset_training_state(self):
+        """
+        Forget replay memory, optimizer moments and reward history so the agent
+        can be reused for a fresh training run (the network weights are kept).
+        """
+        self.memory.clear()
+        self.optimizer.state.clear()
+        self.training_steps = 0
+        self.episode_rewards = []
+        self.moving_avg_rewards = []
+
     # Helpers for saving and loading policy networks
-    def save_model(self, path: str):
+    def save_model(self, path: str, state_dict: Optional[dict] = None):
         """
-        Save the CNN policy network to specified path
+        Save the CNN policy network to specified path.
+        `state_dict` saves those weights instead (e.g. a snapshot taken earlier).
+        Returns False (and writes nothing) if the weights contain NaNs.
         """
-        if self.has_nan_weights():
+        if state_dict is None:
+            state_dict = self.policy_network.state_dict()
+        if any(torch.isnan(tensor).any() for tensor in state_dict.values()):
             print("WARNING: Model contains NaN weights — NOT SAVING")
-            return
-        torch.save(self.policy_network.state_dict(), path)
+            return False
+        # Protocol 5 pickles the small metadata record with fewer copies; tensor data
+        # is stored as raw zip entries either way
+        torch.save(state_dict, path, pickle_protocol=5)
         print(f"Saved model to {path}")
+        return True
     
     def load_model(self, path: str):
         """
@@ -595,4 +741,40 @@ class CNNRLAI(Connect4AI):
         self.policy_network.load_state_dict(state_dict)
         self.target_network.load_state_dict(state_dict)
         print(f"Loaded model weights from {path}")
-        return True
\ No newline at end of file
+        return True
+
+def receive_from_actors(queue, actors, poll_seconds: float = 5.0):
+    """
+    Next game sent by an actor process. Raises RuntimeError instead of waiting
+    forever if an actor crashed or every actor has exited without sending it.
+    """
+    while True:
+        try:
+            return queue.get(timeout=poll_seconds)
+        except queue_module.Empty:
+            for actor in actors:
+                if actor.exitcode not in (None, 0):
+                    raise RuntimeError(f"Actor process {actor.pid} exited with code {actor.exitcode}")
+            if not any(actor.is_alive() for actor in actors):
+                raise RuntimeError("All actor processes exited before sending every game")
+
+def run_actor(shared_network: Connect4CNN,
+              player_id: int,
+              mode: str,
+              num_games: int,
+              epsilon: float,
+              epsilon_decay: float,
+              queue):
+    """
+    Actor process for CNNRLAI.train_with_actors: plays `num_games` games on the CPU with
+    the learner's shared policy network and sends each game's transitions to `queue`.
+    """
+    torch.set_num_threads(1)
+    actor = CNNRLAI(player_id=player_id, epsilon=epsilon, epsilon_decay=epsilon_decay, device="cpu")
+    actor.policy_network = shared_network
+
+    for _ in range(num_games):
+        transitions = []
+        winner, episode_reward = actor.play_episode(mode, lambda *transition: transitions.append(transition))
+        queue.put((transitions, winner, episode_reward))
+        actor.epsilon = max(actor.epsilon_min, actor.epsilon * actor.epsilon_decay)
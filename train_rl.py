@@ -2,64 +2,196 @@
 Script to run training model for Reinforcement Learning AI
 """
 import argparse
+import glob
+import json
+import math
 import os
-from models.rl_cnn_ai import CNNRLAI
+import re
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
 
+# Model filenames look like cnnrl_<mode>_<games>_<eps>.pt, with games as 500, 10k, 1.5M, ...
+GAMES_RE = re.compile(r"cnnrl_[^_]+_(\d+(?:\.\d+)?)([kM]?)_")
+GAMES_MULTIPLIER = {"": 1, "k": 1_000, "M": 1_000_000}
+DECAY_RE = re.compile(r"cnnrl_[^_]+_[^_]+_([0-9.e-]+)\.pt$")
+DEFAULT_EPSILON_DECAY = 0.999995
+
+# Trained models are saved here; created once at the start of main()
+_MODELS_DIR = Path("CNN_models")
+
+# Checkpoints are written in the background while training moves on to the next
+# model; wait_for_saves() collects the results
+_SAVE_POOL = ThreadPoolExecutor(max_workers=1)
+_PENDING_SAVES = []
+_FAILED_SAVES = []
+
+@lru_cache(maxsize=256)
 def format_games(num):
     """
     Format number of games into a compact string
     """
-    if num >= 1_000_000:
-        if num % 1_000_000 == 0:
-            return f"{num // 1_000_000}M"
-        return f"{num / 1_000_000:.1f}M"
-    
-    if num >= 1000:
-        if num % 1000 == 0:
-            return f"{num // 1000}k"
-        return f"{num / 1000:.1f}k"
+    for suffix, div in (("M", 1_000_000), ("k", 1_000)):
+        if num >= div:
+            quotient, rest = divmod(num, div)
+            return f"{quotient}{suffix}" if rest == 0 else f"{num / div:.1f}{suffix}"
     return str(num)
 
+@lru_cache(maxsize=256)
 def read_games_from_filename(filename: str) -> int:
     """
     Parse game count from model name of form cnnrl_<mode>_<games>_<eps>.pt
     Returns int number of games (500k -> 500000).
     """
-    base = os.path.basename(filename).replace(".pt", "")
-    parts = base.split("_")
-    if len(parts) < 4:
+    match = GAMES_RE.match(os.path.basename(filename))
+    if match is None:
         return 0
+    return round(float(match.group(1)) * GAMES_MULTIPLIER[match.group(2)])
 
-    games_part = parts[2]
+@lru_cache(maxsize=256)
+def read_decay_from_filename(filename: str) -> Optional[float]:
+    """
+    Parse epsilon decay from model name of form cnnrl_<mode>_<games>_<eps>.pt
+    Returns None if the name doesn't follow that form.
+    """
+    match = DECAY_RE.match(os.path.basename(filename))
+    if match is None:
+        return None
+    try:
+        return float(match.group(1))
+    except ValueError:
+        return None
 
-    if games_part.endswith("k"):
-        return int(games_part[:-1]) * 1000
-    
-    if games_part.endswith("M"):
-        return int(float(games_part[:-1]) * 1_000_000)
+def metadata_path(model_path: str) -> str:
+    """
+    Sidecar file holding a model's training state: cnnrl_<...>.pt -> cnnrl_<...>.meta.json
+    """
+    return os.path.splitext(model_path)[0] + ".meta.json"
+
+def write_metadata(model_path: str, games: int, epsilon_decay: float, epsilon: float):
+    """
+    Record how far a saved model has been trained next to its .pt file
+    """
+    with open(metadata_path(model_path), "w") as f:
+        json.dump({"games": games, "epsilon_decay": epsilon_decay, "epsilon": epsilon}, f)
 
+def read_metadata(model_path: str):
+    """
+    Training state saved by write_metadata, or None for models saved without it
+    """
     try:
-        return int(games_part)
-    except:
-        return 0
-    
+        with open(metadata_path(model_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_checkpoint(rl, path: str, state_dict: dict, games: int, epsilon_decay: float, epsilon: float):
+    """
+    Save the model weights in `state_dict`, then their metadata. The metadata is only
+    written once the weights are on disk, so it never describes a model that wasn't saved.
+    """
+    if not rl.save_model(path, state_dict):
+        raise RuntimeError("model weights contain NaNs")
+    write_metadata(path, games, epsilon_decay, epsilon)
+
+def save_model_async(rl, path: str, games: int, epsilon_decay: float):
+    """
+    Snapshot the weights and epsilon now, then save them on the background save thread.
+    `rl` can be trained further (e.g. reused for the next resume) while the write runs.
+    """
+    state_dict = {name: tensor.detach().cpu().clone() for name, tensor in rl.policy_network.state_dict().items()}
+    fut = _SAVE_POOL.submit(save_checkpoint, rl, path, state_dict, games, epsilon_decay, rl.epsilon)
+    _PENDING_SAVES.append((path, fut))
+    return fut
+
+def wait_for_saves(model_path: Optional[str] = None) -> bool:
+    """
+    Block until every queued checkpoint write (or only those to `model_path`) has
+    finished and report how each went. Returns False if any save in this process has failed.
+    """
+    for entry in list(_PENDING_SAVES):
+        path, fut = entry
+        if model_path is not None and os.path.realpath(path) != os.path.realpath(model_path):
+            continue
+        _PENDING_SAVES.remove(entry)
+        try:
+            fut.result()
+        except Exception as e:
+            print(f"ERROR: failed to save model to {path}: {e}")
+            _FAILED_SAVES.append(path)
+        else:
+            print(f"Model saved to: {path}")
+    return not _FAILED_SAVES
+
+def games_trained(model_path: str) -> int:
+    """
+    Games a saved model has been trained for: from its metadata, else its filename
+    """
+    metadata = read_metadata(model_path)
+    if metadata is not None:
+        return metadata["games"]
+    return read_games_from_filename(model_path)
+
+def resume_decay(model_path: str, epsilon_decay: Optional[float] = None) -> float:
+    """
+    Epsilon decay to resume `model_path` with: the requested one, else the one the
+    model was trained with (metadata, then filename), else the default
+    """
+    if epsilon_decay is not None:
+        return epsilon_decay
+    metadata = read_metadata(model_path)
+    if metadata is not None:
+        return metadata["epsilon_decay"]
+    decay = read_decay_from_filename(model_path)
+    return decay if decay is not None else DEFAULT_EPSILON_DECAY
+
+def resumed_model_path(mode: str, total_games: int, epsilon_decay: float) -> Path:
+    """
+    Where a model resumed to `total_games` is saved
+    """
+    return _MODELS_DIR / f"cnnrl_{mode}_{format_games(total_games)}_{epsilon_decay}.pt"
+
+@lru_cache(maxsize=4)
+def _get_rl(device: str, epsilon_decay: float):
+    """
+    One CNNRLAI per (device, epsilon_decay), reused across resumes so the networks,
+    CUDA allocations and cuDNN autotuning are only set up once per process
+    """
+    from models.rl_cnn_ai import CNNRLAI
+    return CNNRLAI(player_id=1, epsilon_decay=epsilon_decay, device=device)
+
 def train_resumable(model_path: str,
                     target_total_games: int,
                     mode: str,
                     epsilon_decay: float,
-                    device: str):
+                    device: str,
+                    num_actors: int = 0):
     """
     Resume training an existing model to reach target total games.
     """
     # Load previous training progress
     print(f"Loading model from: {model_path}")
-    already_trained = read_games_from_filename(model_path)
+    # Don't read a checkpoint or sidecar the save thread is still writing
+    wait_for_saves(model_path)
+    metadata = read_metadata(model_path)
+    already_trained = games_trained(model_path)
     print(f"Detected {already_trained:,} previously trained games.")
 
-    rl = CNNRLAI(player_id=1, epsilon_decay=epsilon_decay, device=device)
+    rl = _get_rl(device, epsilon_decay)
+    rl.reset_training_state()
     rl.load_model(model_path)
-    eps_from_schedule = (rl.epsilon_decay ** already_trained)
-    rl.epsilon = max(rl.epsilon_min, eps_from_schedule)
+    if metadata is not None:
+        rl.epsilon = metadata["epsilon"]
+    else:
+        # epsilon after `already_trained` decays: epsilon_decay ** already_trained, in log space
+        if already_trained == 0:
+            eps_from_schedule = 1.0
+        elif rl.epsilon_decay > 0:
+            eps_from_schedule = math.exp(already_trained * math.log(rl.epsilon_decay))
+        else:
+            eps_from_schedule = 0.0
+        rl.epsilon = max(rl.epsilon_min, eps_from_schedule)
 
     remaining = max(0, target_total_games - already_trained)
     print(f"Training remaining {remaining:,} games to reach {target_total_games:,}...")
@@ -69,16 +201,56 @@ def train_resumable(model_path: str,
         return
 
     # Train the extra games
-    rl.train(num_games=remaining, mode=mode)
+    if num_actors:
+        rl.train_with_actors(num_games=remaining, mode=mode, num_actors=num_actors)
+    else:
+        rl.train(num_games=remaining, mode=mode)
 
     # Save a new model with updated filename
     new_games_total = already_trained + remaining
-    save_path = f"CNN_models/cnnrl_{mode}_{format_games(new_games_total)}_{epsilon_decay}.pt"
+    save_path = resumed_model_path(mode, new_games_total, epsilon_decay)
 
-    rl.save_model(save_path)
-    print(f"Saved resumed model as: {save_path}")
+    save_model_async(rl, save_path, new_games_total, epsilon_decay)
+    print(f"Queued save of resumed model as: {save_path}")
 
-def main():
+@lru_cache(maxsize=None)
+def has_cuda() -> bool:
+    """
+    torch.cuda.is_available(), probed once per process
+    """
+    import torch
+    return torch.cuda.is_available()
+
+def resolve_device(device: Optional[str] = None) -> str:
+    """
+    Concrete device for `--device`: the given one, else cuda when available, else cpu
+    """
+    if device is not None:
+        return device
+    return "cuda" if has_cuda() else "cpu"
+
+def init_distributed(device: str):
+    """
+    Join the torch.distributed process group set up by torchrun.
+    Returns (rank, world_size, device). When `device` is a CUDA device each process
+    is pinned to its own GPU (nccl); any other device is kept as is (gloo).
+    """
+    import torch
+    import torch.distributed as dist
+
+    if device.startswith("cuda"):
+        dist.init_process_group(backend="nccl")
+        local_rank = int(os.environ.get("LOCAL_RANK", 0))
+        torch.cuda.set_device(local_rank)
+        device = f"cuda:{local_rank}"
+    else:
+        dist.init_process_group(backend="gloo")
+    return dist.get_rank(), dist.get_world_size(), device
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Command line options for train_rl.py
+    """
     parser = argparse.ArgumentParser(description="Train CNN RL Agent for Connect4")
     parser.add_argument("--mode", type=str, default="random",
                         choices=["random", "self", "heuristic"],
@@ -86,46 +258,126 @@ def main():
     parser.add_argument("--games", type=int, default=None,
                         help="Number of games to train (default = model default)")
     parser.add_argument("--eps", type=float, default=None,
-                        help="Epsilon decay factor (default = model default)")
+                        help="Epsilon decay factor (default = model default; when resuming, the resumed model's own)")
     parser.add_argument("--device", type=str, default=None,
                         help="Device to use: cpu / cuda / cuda:0 (default = auto)")
     parser.add_argument("--resume", type=str, default=None,
                         help="Path to an existing .pt file to resume training.")
+    parser.add_argument("--resume-glob", type=str, default=None,
+                        help="Resume every .pt file matching this pattern, e.g. 'CNN_models/*.pt'.")
     parser.add_argument("--target-games", type=int, default=None,
                         help="Train model until it reaches this many total games.")
+    parser.add_argument("--distributed", action="store_true",
+                        help="Split training across processes (launch with torchrun).")
+    parser.add_argument("--sync-every", type=int, default=100,
+                        help="With --distributed, average weights every N games per process.")
+    parser.add_argument("--num-actors", type=int, default=0,
+                        help="Play games in N actor processes while the main process trains (0 = off).")
+    return parser
+
+@lru_cache(maxsize=None)
+def get_args() -> argparse.Namespace:
+    """
+    Parse and validate the command line once; later calls return the same namespace
+    """
+    parser = build_parser()
     args = parser.parse_args()
+    if args.resume is not None and args.resume_glob is not None:
+        parser.error("--resume and --resume-glob cannot be combined")
+    if args.distributed and (args.resume is not None or args.resume_glob is not None):
+        parser.error("--distributed is not supported with --resume")
+    if args.distributed and args.sync_every < 1:
+        parser.error("--distributed requires --sync-every >= 1")
+    if args.num_actors < 0:
+        parser.error("--num-actors must be >= 0")
+    if args.distributed and args.num_actors:
+        parser.error("--distributed and --num-actors cannot be combined")
+    return args
 
-    # Resumable Training
-    if args.resume is not None:
+def main():
+    args = get_args()
+    _MODELS_DIR.mkdir(exist_ok=True)
+    device = resolve_device(args.device)
+
+    # Resumable Training (one model, or every match of --resume-glob in this process)
+    if args.resume is not None or args.resume_glob is not None:
         if args.target_games is None:
             raise ValueError("--resume requires --target-games")
-        
-        train_resumable(
-            model_path=args.resume,
-            target_total_games=args.target_games,
-            mode=args.mode,
-            epsilon_decay=args.eps if args.eps is not None else 0.999995,
-            device=args.device
-        )
+
+        model_paths = [args.resume] if args.resume is not None else sorted(glob.glob(args.resume_glob))
+        if not model_paths:
+            print(f"No models match {args.resume_glob}")
+
+        # Every model is resumed to the same game count, so models sharing an
+        # epsilon decay would be saved to the same file, possibly one of the matched
+        # models themselves; refuse instead of overwriting anything
+        save_paths = {}
+        for model_path in model_paths:
+            if games_trained(model_path) >= args.target_games:
+                continue
+            save_path = resumed_model_path(args.mode, args.target_games, resume_decay(model_path, args.eps))
+            key = os.path.realpath(save_path)
+            if key in save_paths:
+                raise ValueError(f"{save_paths[key]} and {model_path} would both be saved as {save_path}; "
+                                 f"resume them in separate runs or narrow --resume-glob")
+            if os.path.exists(key):
+                raise ValueError(f"Resuming {model_path} would overwrite the existing {save_path}; "
+                                 f"move it away or pick another --target-games")
+            save_paths[key] = model_path
+
+        for model_path in model_paths:
+            train_resumable(
+                model_path=model_path,
+                target_total_games=args.target_games,
+                mode=args.mode,
+                epsilon_decay=resume_decay(model_path, args.eps),
+                device=device,
+                num_actors=args.num_actors
+            )
         return
 
+    rank, world_size = 0, 1
+    if args.distributed:
+        rank, world_size, device = init_distributed(device)
+
     # Normal Training
-    rl = CNNRLAI(player_id=1, device=args.device)
+    from models.rl_cnn_ai import CNNRLAI
+    rl = CNNRLAI(player_id=1, device=device)
     num_games = args.games if args.games is not None else 10000
     if args.eps is not None:
         rl.epsilon_decay = args.eps
     
     # For printing & saving
     mode = args.mode
-    eps_decay_str = f"{rl.epsilon_decay}"
+    epsilon_decay = rl.epsilon_decay
+    eps_decay_str = f"{epsilon_decay}"
+
+    # Each process plays its share of the games; decay epsilon per process game as
+    # fast as `world_size` single-process games so the schedule over the total matches
+    games_per_process = num_games // world_size
+    num_games = games_per_process * world_size
+    rl.epsilon_decay = epsilon_decay ** world_size
+    if args.num_actors:
+        rl.train_with_actors(num_games=num_games, mode=mode, num_actors=args.num_actors)
+    else:
+        # Label the history with the total games and the decay that was asked for
+        rl.train(num_games=games_per_process, mode=mode,
+                 sync_every=args.sync_every if args.distributed else 0,
+                 history_path=f"training_history/training_{num_games}_{mode}_{epsilon_decay}.npz")
 
-    rl.train(num_games=num_games, mode=mode)
+    if args.distributed:
+        import torch.distributed as dist
+        dist.destroy_process_group()
+        if rank != 0:
+            return
 
     games_label = format_games(num_games)
-    model_path = f"CNN_models/cnnrl_{mode}_{games_label}_{eps_decay_str}.pt"
-    rl.save_model(model_path)
+    model_path = _MODELS_DIR / f"cnnrl_{mode}_{games_label}_{eps_decay_str}.pt"
+    save_model_async(rl, model_path, num_games, epsilon_decay)
 
-    print(f"\nModel saved to: {model_path}\n")
+    print(f"\nQueued model save to: {model_path}\n")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    if not wait_for_saves():
+        raise SystemExit("Some models could not be saved")
\ No newline at end of file